@@ -2,13 +2,15 @@
 from fastapi import FastAPI, Request, Form
 from fastapi.responses import HTMLResponse, StreamingResponse
 from starlette.responses import Response
-from jinja2 import Environment, DictLoader, select_autoescape
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache, Template, select_autoescape
 from datetime import date, timedelta
-from markupsafe import Markup
+from dataclasses import dataclass, astuple, replace
+from functools import lru_cache
+from markupsafe import Markup, escape
 from docx.shared import Pt, Inches, Cm
 from contextlib import asynccontextmanager
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-import io, sqlite3, os
+import asyncio, io, re, sqlite3, os, tempfile, zlib
 
 # Exportadores
 from docx import Document as DocxDocument
@@ -32,97 +34,187 @@ PARTICIPANTES_MULHERES = {
     "Mariana Schneider Viana",
     "Tatiana Gasparini Silva Stelzer",
 }
+# (nome, tratamento, linha de presença) por participante, montado uma única vez
+PARTICIPANTES_META = tuple(
+    (p, "A Sra." if p in PARTICIPANTES_MULHERES else "O Sr.", f"<strong>{p}</strong> - {CARGO};")
+    for p in PARTICIPANTES
+)
 
 DB_PATH = os.getenv("DATABASE_URL", "./atas.db")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 
-TOPICOS = [
+TOPICOS = (
     ("CHINA", "CHINA"),
     ("ESTADOS UNIDOS", "ESTADOS UNIDOS"),
     ("EUROPA", "EUROPA"),
     ("CENÁRIO POLÍTICO BRASILEIRO", "CENÁRIO POLÍTICO BRASILEIRO"),
     ("CENÁRIO ECONÔMICO BRASILEIRO", "CENÁRIO ECONÔMICO BRASILEIRO"),
-]
+)
 
 # ===== Espaçamento (pt) =====
 HEADER_GAP  = 12  # antes do primeiro título, abaixo do cabeçalho
 TITLE_GAP   = 6   # depois de cada título
 SECTION_GAP = 12  # entre blocos principais
 
+DOWNLOAD_CHUNK = 64 * 1024  # tamanho dos blocos nos downloads (PDF/DOCX)
+DOCX_SPOOL_MAX = 4 * 1024 * 1024  # DOCX gerado fica em memória até esse tamanho; acima, vai para arquivo temporário
+
 # --------------------- Datas
 def ptbr_date(d: date) -> str:
     return d.strftime("%d/%m/%Y")
 
+# Tabelas indexadas direto por d.month / d.day (posição 0 vazia)
+NOMES_MES = ("", "janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto", "setembro", "outubro", "novembro", "dezembro")
+ORDINAIS = (
+    "",
+    "primeiro",
+    "segundo",
+    "terceiro",
+    "quarto",
+    "quinto",
+    "sexto",
+    "sétimo",
+    "oitavo",
+    "nono",
+    "décimo",
+    "décimo primeiro",
+    "décimo segundo",
+    "décimo terceiro",
+    "décimo quarto",
+    "décimo quinto",
+    "décimo sexto",
+    "décimo sétimo",
+    "décimo oitavo",
+    "décimo nono",
+    "vigésimo",
+    "vigésimo primeiro",
+    "vigésimo segundo",
+    "vigésimo terceiro",
+    "vigésimo quarto",
+    "vigésimo quinto",
+    "vigésimo sexto",
+    "vigésimo sétimo",
+    "vigésimo oitavo",
+    "vigésimo nono",
+    "trigésimo",
+    "trigésimo primeiro",
+)
+
+def mes_pt(d: date) -> str:
+    return NOMES_MES[d.month]
+
 def mes_ano_pt(d: date) -> str:
-    nomes = {1:"janeiro",2:"fevereiro",3:"março",4:"abril",5:"maio",6:"junho",7:"julho",8:"agosto",9:"setembro",10:"outubro",11:"novembro",12:"dezembro"}
-    return f"{nomes[d.month]} de {d.year}"
+    return f"{NOMES_MES[d.month]} de {d.year}"
 
+@lru_cache(maxsize=512)  # funções puras (date é imutável e hashable): memorizadas
 def menos_dois_meses(d: date) -> date:
     m = d.month - 2; y = d.year
     if m <= 0: m += 12; y -= 1
     dia = min(d.day, 28)
     return date(y, m, dia)
 
+@lru_cache(maxsize=512)
 def primeira_quinta(ano: int, mes: int) -> date:
     d = date(ano, mes, 1)
     offset = (3 - d.weekday()) % 7  # quinta=3
     return d + timedelta(days=offset)
 
 # --------------------- DB
+DB = None  # conexão única compartilhada pelas rotas (aberta no lifespan)
+SCENARIOS_CACHE = {}  # espelho da tabela scenario, atualizado a cada gravação
+MEETING = None  # linha id=1 de meeting (sqlite3.Row), recarregada no lifespan e trocada pelo RETURNING do upsert
+# versão dos dados exibidos em GET / (reunião, cenários, item2, assuntos); vira o ETag da página
+INDEX_BOOT = os.urandom(4).hex(); INDEX_VERSION = 0
+
+def index_touch():
+    global INDEX_VERSION
+    INDEX_VERSION += 1
+
 def db_connect():
-    conn = sqlite3.connect(DB_PATH)
+    # autocommit + WAL: leituras não bloqueiam a escrita e cada comando é sua própria transação
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000")  # espera o lock (ex.: outro processo gravando) em vez de falhar na hora
+    if DB_PATH != ":memory:":  # banco em memória não tem journal em disco nem arquivo para mapear
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # ~64 MB de cache de páginas
     return conn
 
+SCENARIOS_SQL = "SELECT participant, text, topic FROM scenario"
+MEETING_SQL = "SELECT numero, ano, data, hora, local, lavrador FROM meeting WHERE id=1"
+
+def load_scenarios(db) -> dict:
+    cur = db.cursor(); cur.row_factory = None  # tuplas simples, sem o custo do sqlite3.Row
+    return {p: {"text": t, "topic": tp} for p, t, tp in cur.execute(SCENARIOS_SQL)}
+
+# (participante, preenchido?) na ordem de PARTICIPANTES, para partials/status.html
+def status_rows() -> tuple:
+    return tuple((p, bool((SCENARIOS_CACHE.get(p) or {}).get("text", "").strip())) for p in PARTICIPANTES)
+
+# dados da ata para prévia/exportações: reunião e cenários vêm da memória, sem consulta
+def load_ata() -> tuple[sqlite3.Row, dict]:
+    return MEETING, SCENARIOS_CACHE
+
+SCHEMA_VERSION = 1  # gravado em PRAGMA user_version depois das migrações
+
 def ensure_schema():
-    conn = db_connect(); cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS meeting (
-            id INTEGER PRIMARY KEY,
-            numero INTEGER NOT NULL,
-            ano INTEGER NOT NULL,
-            data TEXT NOT NULL,
-            hora TEXT NOT NULL,
-            local TEXT NOT NULL
-        );
-    """)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS scenario (
-            id INTEGER PRIMARY KEY,
-            participant TEXT NOT NULL,
-            text TEXT NOT NULL DEFAULT ''
-        );
-    """)
-    # migrações
-    cur.execute("PRAGMA table_info('scenario')")
-    cols = [r[1] for r in cur.fetchall()]
-    if "topic" not in cols:
-        cur.execute("ALTER TABLE scenario ADD COLUMN topic TEXT NOT NULL DEFAULT ''")
-    cur.execute("PRAGMA table_info('meeting')")
-    mcols = [r[1] for r in cur.fetchall()]
-    if "lavrador" not in mcols:
-        cur.execute("ALTER TABLE meeting ADD COLUMN lavrador TEXT NOT NULL DEFAULT ''")
-
-    cur.execute("SELECT COUNT(1) FROM meeting")
-    if cur.fetchone()[0] == 0:
+    cur = DB.cursor()
+    with DB:  # uma transação só (um fsync) para DDL, migrações e sementes
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("PRAGMA user_version")
+        if cur.fetchone()[0] < SCHEMA_VERSION:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS meeting (
+                    id INTEGER PRIMARY KEY,
+                    numero INTEGER NOT NULL,
+                    ano INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    hora TEXT NOT NULL,
+                    local TEXT NOT NULL
+                );
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS scenario (
+                    id INTEGER PRIMARY KEY,
+                    participant TEXT NOT NULL,
+                    text TEXT NOT NULL DEFAULT ''
+                );
+            """)
+            # migrações
+            cur.execute("PRAGMA table_info('scenario')")
+            cols = [r[1] for r in cur.fetchall()]
+            if "topic" not in cols:
+                cur.execute("ALTER TABLE scenario ADD COLUMN topic TEXT NOT NULL DEFAULT ''")
+            cur.execute("PRAGMA table_info('meeting')")
+            mcols = [r[1] for r in cur.fetchall()]
+            if "lavrador" not in mcols:
+                cur.execute("ALTER TABLE meeting ADD COLUMN lavrador TEXT NOT NULL DEFAULT ''")
+
+            # a ata corrente é sempre a linha id=1 (bancos antigos: promove a primeira linha)
+            cur.execute("UPDATE meeting SET id=1 WHERE id=(SELECT MIN(id) FROM meeting) AND NOT EXISTS (SELECT 1 FROM meeting WHERE id=1)")
+            # um cenário por participante (remove duplicatas de bancos antigos antes do índice único)
+            cur.execute("DELETE FROM scenario WHERE id NOT IN (SELECT MIN(id) FROM scenario GROUP BY participant)")
+            cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_scenario_participant ON scenario(participant)")
+            cur.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+        # sementes idempotentes: só inserem o que ainda não existe
         hoje = date.today(); pq = primeira_quinta(hoje.year, hoje.month)
         cur.execute(
-            "INSERT INTO meeting (numero, ano, data, hora, local, lavrador) VALUES (?, ?, ?, ?, ?, ?)",
+            "INSERT OR IGNORE INTO meeting (id, numero, ano, data, hora, local, lavrador) VALUES (1, ?, ?, ?, ?, ?, ?)",
             (4, hoje.year, pq.isoformat(), "14:00", "Sala nº 408 do 4º andar do IPAJM", ""),
         )
-    cur.execute("SELECT COUNT(1) FROM scenario")
-    if cur.fetchone()[0] == 0:
-        for p in PARTICIPANTES:
-            cur.execute("INSERT INTO scenario (participant, text, topic) VALUES (?, '', '')", (p,))
-    conn.commit(); conn.close()
+        cur.executemany("INSERT OR IGNORE INTO scenario (participant, text, topic) VALUES (?, '', '')", [(p,) for p in PARTICIPANTES])
 
 # --------------------- HTML TEMPLATES (UI + Prévia/PDF)
 TEMPLATES = {
     "base.html": r"""<!doctype html><html lang="pt-br"><head>
   <meta charset="utf-8"/><meta name="viewport" content="width=device-width, initial-scale=1"/>
   <title>{{ title }}</title>
-  <script src="https://unpkg.com/htmx.org@1.9.12"></script>
+  <script src="https://unpkg.com/htmx.org@1.9.12/dist/htmx.min.js" defer></script>
   <script src="https://cdn.tailwindcss.com"></script>
   <style>
     body{font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif; font-size:16px; color:#111827}
@@ -150,7 +242,7 @@ TEMPLATES = {
   <section class="bg-white rounded-xl shadow p-4">
     <h2 class="text-base h-bold mb-3">Item 01 — Cenário (por analista)</h2>
     <div id="item1-form">{% include 'partials/item1_form.html' with context %}</div>
-    <div id="status-list">{% include 'partials/status.html' %}</div>
+    {% include 'partials/status.html' %}
   </section>
 
   <section class="bg-white rounded-xl shadow p-4">
@@ -242,8 +334,7 @@ TEMPLATES = {
 <div id="status-list">
   <h3 class="font-medium mb-2">Status dos participantes</h3>
   <ul class="grid grid-cols-1 md:grid-cols-2 gap-2">
-    {% for p in participantes %}
-      {% set ok = scenarios.get(p, {}).get('text','').strip()|length > 0 %}
+    {% for p, ok in status_rows %}
       <li class="flex items-center justify-between px-3 py-2 rounded border {{ 'bg-emerald-50 border-emerald-200' if ok else 'bg-gray-50' }}">
         <span class="text-sm">{{ p }}</span>
         <div class="flex items-center gap-2">
@@ -276,28 +367,67 @@ TEMPLATES = {
 """,
 }
 
-env = Environment(loader=DictLoader(TEMPLATES), autoescape=select_autoescape(["html","xml"]))
-def render(name: str, **ctx) -> HTMLResponse:
-    return HTMLResponse(env.get_template(name).render(**ctx))
+# CSS embutido no base.html minificado uma vez no import (menos bytes em toda página)
+def _minify_css(m: re.Match) -> str:
+    css = re.sub(r"\s*([{};:,])\s*", r"\1", re.sub(r"\s+", " ", m.group(2)))
+    return m.group(1) + css.replace(";}", "}").strip() + m.group(3)
+TEMPLATES["base.html"] = re.sub(r"(<style>)(.*?)(</style>)", _minify_css, TEMPLATES["base.html"], flags=re.S)
+
+# opções que mudam o código compilado; entram no nome do arquivo do bytecode cache, que só confere o fonte
+JINJA_OPTS = dict(trim_blocks=True, lstrip_blocks=True)  # sem as linhas em branco que as tags {% %} deixavam
+# bytecode compilado fica no diretório temporário do usuário: reinícios não recompilam os templates
+env = Environment(loader=DictLoader(TEMPLATES), autoescape=select_autoescape(["html","xml"]),
+                  auto_reload=False, cache_size=-1, **JINJA_OPTS,
+                  bytecode_cache=FileSystemBytecodeCache(pattern=f"__atas_{zlib.crc32(repr(JINJA_OPTS).encode()):08x}_%s.cache"))
+
+def render(tpl: Template, **ctx) -> HTMLResponse:
+    return HTMLResponse(tpl.render(**ctx))
 
 def nl2br(value: str) -> Markup:
     if not value: return Markup("")
-    return Markup(value.replace("\n", "<br/>"))
+    # escapa primeiro (em C, via markupsafe) e só então insere as quebras: texto do usuário não vira HTML
+    return escape(value).replace("\n", Markup("<br/>"))
 env.filters["nl2br"] = nl2br
+# constantes: resolvidas pelos globals, fora do contexto de cada render
+env.globals.update(topicos=TOPICOS, participantes=PARTICIPANTES)
+
+# Templates compilados uma única vez (evita loader/cache do Jinja a cada requisição)
+for _name in TEMPLATES: env.get_template(_name)  # aquece também base.html, herdado por index.html
+T_INDEX = env.get_template("index.html")
+T_SESSION = env.get_template("partials/session.html")
+T_ITEM1 = env.get_template("partials/item1_form.html")
+T_STATUS = env.get_template("partials/status.html")
+T_PREVIEW = env.get_template("partials/preview_modal.html")
 
 # --------------------- Estado
 ITEM2_DEFAULT = "Não houve realocações de recursos desde a última reunião até a presente data."
 ASSUNTOS_DEFAULT = "– Assuntos gerais discutidos e/ou Eventos:"
-STATE = {"item2": ITEM2_DEFAULT, "assuntos": ASSUNTOS_DEFAULT, "resumo": {"rentab": "", "difpp": "", "posicao": "abaixo", "risco": ""}}
+
+@dataclass(slots=True)
+class AppState:
+    item2: str = ITEM2_DEFAULT
+    assuntos: str = ASSUNTOS_DEFAULT
+    # Item 03
+    rentab: str = ""
+    difpp: str = ""
+    posicao: str = "abaixo"
+    risco: str = ""
+
+STATE = AppState()
 
 # --------------------- App
 app = FastAPI(title=APP_TITLE)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global DB, MEETING
     os.makedirs(STATIC_DIR, exist_ok=True)
+    DB = db_connect()
     ensure_schema()
+    MEETING = DB.execute(MEETING_SQL).fetchone(); SCENARIOS_CACHE.update(load_scenarios(DB))
     yield
+    DB.execute("PRAGMA optimize")  # atualiza estatísticas do planejador só onde valer a pena (recomendado ao fechar)
+    DB.close()
 
 app = FastAPI(title=APP_TITLE, lifespan=lifespan)
 
@@ -305,207 +435,196 @@ app = FastAPI(title=APP_TITLE, lifespan=lifespan)
 def numero_sessao_fmt(numero: int, ano: int) -> str:
     return f"{numero:03d}/{ano}"
 
-def _prefixo_genero(nome: str) -> str:
-    return "A Sra." if nome in PARTICIPANTES_MULHERES else "O Sr."
+ITEM1_PARTE = "<strong>{pref} {nome}</strong> falando sobre {tema}, {texto} "
 
 def item1_single_paragraph(meeting: dict, scenarios: dict) -> str:
     d = date.fromisoformat(meeting["data"])
-
-    ORDINAIS = {
-        1: "primeiro",
-        2: "segundo",
-        3: "terceiro",
-        4: "quarto",
-        5: "quinto",
-        6: "sexto",
-        7: "sétimo",
-        8: "oitavo",
-        9: "nono",
-        10: "décimo",
-        11: "décimo primeiro",
-        12: "décimo segundo",
-        13: "décimo terceiro",
-        14: "décimo quarto",
-        15: "décimo quinto",
-        16: "décimo sexto",
-        17: "décimo sétimo",
-        18: "décimo oitavo",
-        19: "décimo nono",
-        20: "vigésimo",
-        21: "vigésimo primeiro",
-        22: "vigésimo segundo",
-        23: "vigésimo terceiro",
-        24: "vigésimo quarto",
-        25: "vigésimo quinto",
-        26: "vigésimo sexto",
-        27: "vigésimo sétimo",
-        28: "vigésimo oitavo",
-        29: "vigésimo nono",
-        30: "trigésimo",
-        31: "trigésimo primeiro"
-    }
-
     intro = (
-        f"No {ORDINAIS.get(d.day, str(d.day))} dia do mês de {mes_ano_pt(d).split(' de ')[0]} "
+        f"No {ORDINAIS[d.day]} dia do mês de {mes_pt(d)} "
         f"do ano de {d.year}, às {meeting['hora']} horas, na {meeting['local']}, "
         f"ocorreu a {meeting['numero']}ª Reunião Ordinária dos Membros do Comitê de Investimentos. "
     )
 
     partes = [intro]
-    for nome in PARTICIPANTES:
-        row = scenarios.get(nome, {"text": "", "topic": ""})
-        texto = (row.get("text") or "").strip()
-        tema = (row.get("topic") or "").strip()
-        if texto:
-            partes.append(
-                f"<strong>{_prefixo_genero(nome)} {nome}</strong> falando sobre {tema}, {texto} "
-            )
-
+    partes.extend(
+        ITEM1_PARTE.format(pref=pref, nome=nome, tema=(row.get("topic") or "").strip(), texto=texto)
+        for nome, pref, _ in PARTICIPANTES_META
+        if (row := scenarios.get(nome)) and (texto := (row.get("text") or "").strip())
+    )
     return "<p>" + "".join(partes).strip() + "</p>"
 
 
+# Textos fixos do Item 03 (compartilhados entre prévia/PDF e DOCX)
+ITEM3_INTRO = ("O Comitê de Investimentos, buscando transmitir maior transparência em relação às análises dos investimentos do Instituto e, em consequência, "
+               "aderindo às normas do Pró-Gestão, elabora o “Relatório de Análise de Investimentos IPAJM”. "
+               "Este relatório já foi encaminhado à SCO – Subgerência de Contabilidade e Orçamento, para posterior envio para análise do Conselho Fiscal do IPAJM.")
+ITEM3_P4_FIM = ("respeitando o estabelecido na legislação em vigor e dentro dos percentuais definidos.  Considerando que as taxas ainda são negociadas "
+                "acima da meta atuarial, seguimos com a estratégia de alcançar o alvo definido de 60% de alocação em Títulos Públicos.")
+
 def item3_html(meeting: dict) -> str:
     d = date.fromisoformat(meeting["data"]); d2 = menos_dois_meses(d); mes_ano = mes_ano_pt(d2)
-    p0 = ("O Comitê de Investimentos, buscando transmitir maior transparência em relação às análises dos investimentos do Instituto e, em consequência, "
-          "aderindo às normas do Pró-Gestão, elabora o “Relatório de Análise de Investimentos IPAJM”. "
-          "Este relatório já foi encaminhado à SCO – Subgerência de Contabilidade e Orçamento, para posterior envio para análise do Conselho Fiscal do IPAJM. "
-          f"Segue abaixo um resumo relativo aos itens abordados no Relatório supracitado de {mes_ano}:")
-    r = STATE["resumo"]; rentab=r["rentab"]; difpp=r["difpp"]; pos=r["posicao"]; risco=r["risco"]
-    p1 = f"1) Acompanhamento da rentabilidade -  A rentabilidade consolidada dos investimentos do Fundo Previdenciário em {mes_ano} foi de {rentab}, ficando {difpp} p.p. {pos} da meta atuarial."
-    p2 = f"2) Avaliação de risco da carteira - O grau de variação nas rentabilidades está coerente com o grau de risco assumido, em {risco}."
-    p3 = f"3) Execução da Política de Investimentos – As movimentações financeiras realizadas no mês de {mes_ano} estão de acordo com as deliberações estabelecidas com a Diretoria de Investimentos e com a legislação vigente."
-    p4 = f"4) Aderência a Política de Investimentos - Os recursos investidos, abrangendo a carteira consolidada, que representa o patrimônio total do RPPS sob gestão, estão aderentes à Política de Investimentos de {meeting['ano']}, respeitando o estabelecido na legislação em vigor e dentro dos percentuais definidos.  Considerando que as taxas ainda são negociadas acima da meta atuarial, seguimos com a estratégia de alcançar o alvo definido de 60% de alocação em Títulos Públicos."
-    return "\n".join([f"<p><strong>{t}</strong></p>" if i==0 else f"<p>{t}</p>" for i,t in enumerate([p0,p1,p2,p3,p4])])
+    return (
+        f"<p><strong>{ITEM3_INTRO} Segue abaixo um resumo relativo aos itens abordados no Relatório supracitado de {mes_ano}:</strong></p>\n"
+        f"<p>1) Acompanhamento da rentabilidade -  A rentabilidade consolidada dos investimentos do Fundo Previdenciário em {mes_ano} foi de {STATE.rentab}, ficando {STATE.difpp} p.p. {STATE.posicao} da meta atuarial.</p>\n"
+        f"<p>2) Avaliação de risco da carteira - O grau de variação nas rentabilidades está coerente com o grau de risco assumido, em {STATE.risco}.</p>\n"
+        f"<p>3) Execução da Política de Investimentos – As movimentações financeiras realizadas no mês de {mes_ano} estão de acordo com as deliberações estabelecidas com a Diretoria de Investimentos e com a legislação vigente.</p>\n"
+        f"<p>4) Aderência a Política de Investimentos - Os recursos investidos, abrangendo a carteira consolidada, que representa o patrimônio total do RPPS sob gestão, estão aderentes à Política de Investimentos de {meeting['ano']}, {ITEM3_P4_FIM}</p>"
+    )
 
-def ata_html_full(meeting: dict, scenarios: dict) -> str:
-    d = date.fromisoformat(meeting["data"]); numero_fmt = numero_sessao_fmt(meeting["numero"], meeting["ano"])
-    presencas_html = "<br/>".join([f"<strong>{p}</strong> - {CARGO};" for p in PARTICIPANTES])
-    blocos = [
-        f"<p><strong>Sessão Ordinária nº {numero_fmt}</strong></p>",
-        f"<p><strong>Data:</strong> {ptbr_date(d)}.<br/><strong>Hora:</strong> {meeting['hora']}h.<br/><strong>Local:</strong> {meeting['local']}.</p>",
-        "<p><strong>Presenças:</strong></p>",
-        f"<p>{presencas_html}</p>",
-        "<p><strong>Ordem do Dia:</strong></p>",
-        "<p>1. <strong>Cenário Político e Econômico Interno</strong> e <strong>Cenário Econômico Externo (EUA, Europa e China)</strong>;<br/>"
-        "2. <strong>Movimentações e Aplicações financeiras</strong>;<br/>"
-        "3. <strong>Acompanhamento dos Recursos Investidos</strong>;<br/>"
-        "4. <strong>Assuntos Gerais</strong>.</p>",
-        "<p><strong>Item 01 – Cenário Político e Econômico Interno e Cenário Econômico Externo (EUA, Europa e China):</strong></p>",
-        item1_single_paragraph(meeting, scenarios),
-        "<p><strong>Item 02 – Movimentações e Aplicações financeiras</strong></p>",
-        f"<p>{STATE['item2']}</p>",
-        "<p><strong>Item 03 – Acompanhamento dos Recursos Investidos:</strong></p>",
-        item3_html(meeting),
-        "<p><strong>Item 04 – Assuntos Gerais</strong></p>",
-        f"<p>{STATE['assuntos']}</p>",
-        (lambda lav: f"<p>Nada mais havendo a tratar, foi encerrada a reunião e eu, "
-                     f"{f'<strong>{lav}</strong>' if lav else '___________________________________'}, "
-                     "lavrei a presente Ata, assinada pelos membros presentes do Comitê de Investimentos.</p>")((meeting.get('lavrador') or '').strip()),
-        f"<p><strong>{PARTICIPANTES[0]}</strong>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;<strong>{PARTICIPANTES[1]}</strong><br/>{CARGO}&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;{CARGO}</p>",
-        f"<p><strong>{PARTICIPANTES[2]}</strong>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;<strong>{PARTICIPANTES[3]}</strong><br/>{CARGO}&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;{CARGO}</p>",
-        f"<p><strong>{PARTICIPANTES[4]}</strong><br/>{CARGO}</p>",
-    ]
-    # Cabeçalho HTML/PDF
-    brasao = os.path.join(STATIC_DIR, "brasao.png")
-    simbolo = os.path.join(STATIC_DIR, "simbolo.png")
-    header_html = f"""
+# Trechos fixos da ata (não dependem da reunião nem dos cenários)
+PRESENCAS_HTML = "<br/>".join(linha for _, _, linha in PARTICIPANTES_META)
+ORDEM_DO_DIA_HTML = (
+    "<p>1. <strong>Cenário Político e Econômico Interno</strong> e <strong>Cenário Econômico Externo (EUA, Europa e China)</strong>;<br/>"
+    "2. <strong>Movimentações e Aplicações financeiras</strong>;<br/>"
+    "3. <strong>Acompanhamento dos Recursos Investidos</strong>;<br/>"
+    "4. <strong>Assuntos Gerais</strong>.</p>"
+)
+ASSINATURAS_HTML = (
+    f"<p><strong>{PARTICIPANTES[0]}</strong>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;<strong>{PARTICIPANTES[1]}</strong><br/>{CARGO}&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;{CARGO}</p>\n"
+    f"<p><strong>{PARTICIPANTES[2]}</strong>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;<strong>{PARTICIPANTES[3]}</strong><br/>{CARGO}&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;{CARGO}</p>\n"
+    f"<p><strong>{PARTICIPANTES[4]}</strong><br/>{CARGO}</p>"
+)
+# Cabeçalho HTML/PDF
+HEADER_HTML = f"""
     <div style="width:100%; display:flex; align-items:center; justify-content:space-between; margin-bottom:8px;">
-      <img src="{brasao}" style="height:42px"/>
+      <img src="{os.path.join(STATIC_DIR, "brasao.png")}" style="height:42px"/>
       <div style="text-align:center; font-family: Calibri; font-size:11pt; font-weight:700; color:#000;">
         GOVERNO DO ESTADO DO ESPÍRITO SANTO<br/>INSTITUTO DE PREVIDÊNCIA DOS<br/>SERVIDORES DO ESTADO DO ESPÍRITO SANTO
       </div>
-      <img src="{simbolo}" style="height:42px"/>
+      <img src="{os.path.join(STATIC_DIR, "simbolo.png")}" style="height:42px"/>
     </div>
     <div style="border-bottom:1px solid #000; margin:2px 0 8px 0; text-align:center;">IPAJM</div>
     """
-    return header_html + "\n".join(blocos)
+
+def ata_html_full(meeting: dict, scenarios: dict) -> str:
+    d = date.fromisoformat(meeting["data"]); numero_fmt = numero_sessao_fmt(meeting["numero"], meeting["ano"])
+    lav = (meeting["lavrador"] or "").strip()
+    lavrador = f"<strong>{lav}</strong>" if lav else "___________________________________"
+    return f"""{HEADER_HTML}<p><strong>Sessão Ordinária nº {numero_fmt}</strong></p>
+<p><strong>Data:</strong> {ptbr_date(d)}.<br/><strong>Hora:</strong> {meeting['hora']}h.<br/><strong>Local:</strong> {meeting['local']}.</p>
+<p><strong>Presenças:</strong></p>
+<p>{PRESENCAS_HTML}</p>
+<p><strong>Ordem do Dia:</strong></p>
+{ORDEM_DO_DIA_HTML}
+<p><strong>Item 01 – Cenário Político e Econômico Interno e Cenário Econômico Externo (EUA, Europa e China):</strong></p>
+{item1_single_paragraph(meeting, scenarios)}
+<p><strong>Item 02 – Movimentações e Aplicações financeiras</strong></p>
+<p>{STATE.item2}</p>
+<p><strong>Item 03 – Acompanhamento dos Recursos Investidos:</strong></p>
+{item3_html(meeting)}
+<p><strong>Item 04 – Assuntos Gerais</strong></p>
+<p>{STATE.assuntos}</p>
+<p>Nada mais havendo a tratar, foi encerrada a reunião e eu, {lavrador}, lavrei a presente Ata, assinada pelos membros presentes do Comitê de Investimentos.</p>
+{ASSINATURAS_HTML}"""
+@lru_cache(maxsize=32)
+def _ata_html_cached(meeting: sqlite3.Row, scenarios_key: tuple, state_key: tuple) -> str:
+    # sqlite3.Row é hashable (colunas + valores); state_key só compõe a chave: ata_html_full lê o STATE
+    return ata_html_full(meeting, {p: {"text": t, "topic": tp} for p, t, tp in scenarios_key})
+
+# ata_html_full memorizada por (reunião, cenários, STATE): prévias repetidas não remontam o HTML
+def ata_html_cached(meeting: sqlite3.Row, scenarios: dict) -> str:
+    scenarios_key = tuple(sorted((p, r["text"], r["topic"]) for p, r in scenarios.items()))
+    return _ata_html_cached(meeting, scenarios_key, astuple(STATE))
+
+# modal já codificado em UTF-8: o ata_html vem do cache acima (mesmo objeto, hash já calculado)
+@lru_cache(maxsize=8)
+def preview_modal_bytes(ata_html: str) -> bytes:
+    return T_PREVIEW.render(ata_html=ata_html).encode("utf-8")
 
 # --------------------- ROTAS (UI)
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    conn = db_connect(); cur = conn.cursor()
-    cur.execute("SELECT * FROM meeting LIMIT 1"); meeting = dict(cur.fetchone())
-    cur.execute("SELECT participant, text, topic FROM scenario")
-    scenarios = {r[0]: {"text": r[1], "topic": r[2]} for r in cur.fetchall()}
-    conn.close()
-    ata_html = ata_html_full(meeting, scenarios)
-    return render("index.html", title=APP_TITLE, participantes=PARTICIPANTES, topicos=TOPICOS,
-                  meeting=meeting, scenarios=scenarios, item2=STATE["item2"], assuntos=STATE["assuntos"], ata_html=ata_html)
+    etag = f'"{INDEX_BOOT}-{INDEX_VERSION}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    resp = render(T_INDEX, title=APP_TITLE, meeting=MEETING, status_rows=status_rows(),
+                  item2=STATE.item2, assuntos=STATE.assuntos)
+    resp.headers["ETag"] = etag; resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 @app.post("/meeting/update")
 async def meeting_update(numero: int = Form(...), ano: int = Form(...), data: str = Form(...),
                          hora: str = Form(...), local: str = Form(...), lavrador: str = Form("")):
-    conn = db_connect(); cur = conn.cursor()
-    cur.execute("SELECT id FROM meeting LIMIT 1"); mid = cur.fetchone()[0]
-    cur.execute("UPDATE meeting SET numero=?, ano=?, data=?, hora=?, local=?, lavrador=? WHERE id=?",
-                (numero, ano, data, hora, local, lavrador, mid))
-    conn.commit()
-    cur.execute("SELECT * FROM meeting WHERE id=?", (mid,)); meeting = dict(cur.fetchone()); conn.close()
-    html = env.get_template("partials/session.html").render(meeting=meeting, participantes=PARTICIPANTES)
-    return HTMLResponse(html)
+    global MEETING
+    cur = DB.cursor()
+    cur.execute("""
+        INSERT INTO meeting (id, numero, ano, data, hora, local, lavrador)
+        VALUES (1, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET numero=excluded.numero, ano=excluded.ano, data=excluded.data,
+                                      hora=excluded.hora, local=excluded.local, lavrador=excluded.lavrador
+        RETURNING numero, ano, data, hora, local, lavrador
+    """, (numero, ano, data, hora, local, lavrador))
+    MEETING = cur.fetchone(); index_touch()
+    return render(T_SESSION, meeting=MEETING)
 
 @app.get("/scenario/form")
 async def scenario_form(participant: str):
-    conn = db_connect(); cur = conn.cursor()
-    cur.execute("SELECT participant, text, topic FROM scenario WHERE participant=?", (participant,))
-    row = cur.fetchone(); conn.close()
+    row = SCENARIOS_CACHE.get(participant)
     text = row["text"] if row else ""; topic = row["topic"] if row else ""
-    html = env.get_template("partials/item1_form.html").render(participantes=PARTICIPANTES, topicos=TOPICOS,
-                                                               participant=participant, topic=topic, text=text)
-    return HTMLResponse(html)
+    return render(T_ITEM1, participant=participant, topic=topic, text=text)
 
 @app.post("/scenario/save")
 async def scenario_save(participant: str = Form(...), topic: str = Form(...), text: str = Form(...)):
-    conn = db_connect(); cur = conn.cursor()
+    cur = DB.cursor()
     cur.execute("UPDATE scenario SET text=?, topic=? WHERE participant=?", (text, topic, participant))
-    conn.commit()
-    cur.execute("SELECT participant, text, topic FROM scenario")
-    scenarios = {r[0]: {"text": r[1], "topic": r[2]} for r in cur.fetchall()}
-    conn.close()
-    status_html = env.get_template("partials/status.html").render(participantes=PARTICIPANTES, scenarios=scenarios)
-    return HTMLResponse(f'<div id="status-list">{status_html}</div>')
+    if cur.rowcount: SCENARIOS_CACHE[participant] = {"text": text, "topic": topic}; index_touch()
+    return render(T_STATUS, status_rows=status_rows())
 
 @app.post("/preview/update")
 async def preview_update(item2: str = Form(...), assuntos: str = Form(...)):
-    STATE["item2"] = item2; STATE["assuntos"] = assuntos
+    if (STATE.item2, STATE.assuntos) != (item2, assuntos):  # reenvio igual não invalida o ETag de GET /
+        STATE.item2 = item2; STATE.assuntos = assuntos; index_touch()
     return Response(status_code=204)
 
 @app.post("/resumo/update")
 async def resumo_update(rentab: str = Form(""), difpp: str = Form(""), posicao: str = Form("abaixo"), risco: str = Form("")):
-    STATE["resumo"].update({"rentab": rentab, "difpp": difpp, "posicao": posicao, "risco": risco})
+    STATE.rentab = rentab; STATE.difpp = difpp; STATE.posicao = posicao; STATE.risco = risco
     return Response(status_code=204)
 
 @app.get("/preview/modal")
 async def preview_modal():
-    conn = db_connect(); cur = conn.cursor()
-    cur.execute("SELECT * FROM meeting LIMIT 1"); meeting = dict(cur.fetchone())
-    cur.execute("SELECT participant, text, topic FROM scenario")
-    scenarios = {r[0]: {"text": r[1], "topic": r[2]} for r in cur.fetchall()}
-    conn.close()
-    ata_html = ata_html_full(meeting, scenarios)
-    html = env.get_template("partials/preview_modal.html").render(ata_html=ata_html)
-    return HTMLResponse(html)
+    meeting, scenarios = load_ata()
+    return HTMLResponse(preview_modal_bytes(ata_html_cached(meeting, scenarios)))
 
 # --------------------- Exportações
+def _iter_spool(spool):
+    try:
+        while chunk := spool.read(DOWNLOAD_CHUNK):
+            yield chunk
+    finally:
+        spool.close()
+
+# Moldura do HTML do PDF (um único %s para o corpo da ata)
+PDF_WRAPPER = """<html><head><meta charset='utf-8'>
+      <style>body { font-family: Calibri, Arial; font-size: 11pt; color:#000; }
+        .content { white-space: normal; text-align: justify; }</style>
+    </head><body><div class="content">%s</div></body></html>"""
+
+def build_pdf(html: str) -> io.BytesIO:
+    pdf_buf = io.BytesIO(); pisa.CreatePDF(io.BytesIO(html.encode("utf-8")), dest=pdf_buf, encoding="utf-8")
+    pdf_buf.seek(0)
+    return pdf_buf
+
 @app.get("/export/pdf")
 async def export_pdf():
-    conn = db_connect(); cur = conn.cursor()
-    cur.execute("SELECT * FROM meeting LIMIT 1"); meeting = dict(cur.fetchone())
-    cur.execute("SELECT participant, text, topic FROM scenario")
-    scenarios = {r[0]: {"text": r[1], "topic": r[2]} for r in cur.fetchall()}
-    conn.close()
-    html_body = ata_html_full(meeting, scenarios)
-    html = f"""<html><head><meta charset='utf-8'>
-      <style>body {{ font-family: Calibri, Arial; font-size: 11pt; color:#000; }}
-        .content {{ white-space: normal; text-align: justify; }}</style>
-    </head><body><div class="content">{html_body}</div></body></html>"""
-    pdf_buf = io.BytesIO(); pisa.CreatePDF(io.StringIO(html), dest=pdf_buf)
-    pdf_buf.seek(0)
+    meeting, scenarios = load_ata()
+    html_body = ata_html_cached(meeting, scenarios)
+    pdf_buf = await asyncio.to_thread(build_pdf, PDF_WRAPPER % html_body)
     filename = f"Ata_{meeting['numero']:03d}-{meeting['ano']}.pdf"
-    return StreamingResponse(pdf_buf, media_type="application/pdf",
-                             headers={"Content-Disposition": f"attachment; filename={filename}"})
+    return StreamingResponse(_iter_spool(pdf_buf), media_type="application/pdf",
+                             headers={"Content-Disposition": f"attachment; filename={filename}",
+                                      "Content-Length": str(pdf_buf.getbuffer().nbytes)})
 
 # ---------- DOCX programático ----------
+def _docx_base() -> bytes:
+    doc = DocxDocument()
+    style = doc.styles["Normal"]; style.font.name = "Calibri"; style.font.size = Pt(11)
+    buf = io.BytesIO(); doc.save(buf)
+    return buf.getvalue()
+
+# Esqueleto com o estilo Normal já em Calibri 11; runs herdam a fonte do estilo
+DOCX_BASE = _docx_base()
+
 def _set_cell_borders(cell, bottom=True):
     tc = cell._tc; tcPr = tc.get_or_add_tcPr(); tcBorders = OxmlElement("w:tcBorders")
     if bottom:
@@ -523,15 +642,15 @@ def _add_header_image(doc: DocxDocument, path=os.path.join(STATIC_DIR, "cabecalh
 
 def _add_paragraph(doc, text, bold=False, align=WD_ALIGN_PARAGRAPH.JUSTIFY, space_after_pt=0):
     p = doc.add_paragraph()
-    run = p.add_run(text); run.font.name = "Calibri"; run.font.size = Pt(11); run.bold = bold
+    run = p.add_run(text); run.bold = bold
     p.alignment = align
     if space_after_pt: p.paragraph_format.space_after = Pt(space_after_pt)
     return p
 
 def _add_label_value(doc, label, value, space_after_pt=0):
     p = doc.add_paragraph()
-    r1 = p.add_run(f"{label}: "); r1.bold = True; r1.font.name = "Calibri"; r1.font.size = Pt(11)
-    r2 = p.add_run(value); r2.font.name = "Calibri"; r2.font.size = Pt(11)
+    r1 = p.add_run(f"{label}: "); r1.bold = True
+    p.add_run(value)
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     if space_after_pt: p.paragraph_format.space_after = Pt(space_after_pt)
     return p
@@ -539,58 +658,21 @@ def _add_label_value(doc, label, value, space_after_pt=0):
 def _add_title(doc, text, space_after_pt=TITLE_GAP):
     return _add_paragraph(doc, text, bold=True, align=WD_ALIGN_PARAGRAPH.LEFT, space_after_pt=space_after_pt)
 
-def _prefixo_genero_docx(nome: str) -> str:
-    return "A Sra." if nome in PARTICIPANTES_MULHERES else "O Sr."
-
 def _item01_single_paragraph_docx(doc, meeting, scenarios, space_after_pt=SECTION_GAP):
     d = date.fromisoformat(meeting["data"])
-    ORDINAIS = {
-        1: "primeiro",
-        2: "segundo",
-        3: "terceiro",
-        4: "quarto",
-        5: "quinto",
-        6: "sexto",
-        7: "sétimo",
-        8: "oitavo",
-        9: "nono",
-        10: "décimo",
-        11: "décimo primeiro",
-        12: "décimo segundo",
-        13: "décimo terceiro",
-        14: "décimo quarto",
-        15: "décimo quinto",
-        16: "décimo sexto",
-        17: "décimo sétimo",
-        18: "décimo oitavo",
-        19: "décimo nono",
-        20: "vigésimo",
-        21: "vigésimo primeiro",
-        22: "vigésimo segundo",
-        23: "vigésimo terceiro",
-        24: "vigésimo quarto",
-        25: "vigésimo quinto",
-        26: "vigésimo sexto",
-        27: "vigésimo sétimo",
-        28: "vigésimo oitavo",
-        29: "vigésimo nono",
-        30: "trigésimo",
-        31: "trigésimo primeiro"
-    }
     intro = (
-        f"No {ORDINAIS.get(d.day, str(d.day))} dia do mês de {mes_ano_pt(d).split(' de ')[0]} "
+        f"No {ORDINAIS[d.day]} dia do mês de {mes_pt(d)} "
         f"às {meeting['hora']} horas, na {meeting['local']}, ocorreu a {meeting['numero']}ª "
         f"Reunião Ordinária dos Membros do Comitê de Investimentos. "
     )
     p = doc.add_paragraph(); p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-    r = p.add_run(intro); r.font.name = "Calibri"; r.font.size = Pt(11)
-    for nome in PARTICIPANTES:
+    p.add_run(intro)
+    for nome, pref, _ in PARTICIPANTES_META:
         row = scenarios.get(nome, {"text": "", "topic": ""})
         texto = (row.get("text") or "").strip(); tema = (row.get("topic") or "").strip()
         if texto:
-            pref = _prefixo_genero_docx(nome)
-            rb = p.add_run(f"{pref} {nome}"); rb.bold = True; rb.font.name = "Calibri"; rb.font.size = Pt(11)
-            p.add_run(f" falando sobre {tema}, {texto} ").font.size = Pt(11)
+            rb = p.add_run(f"{pref} {nome}"); rb.bold = True
+            p.add_run(f" falando sobre {tema}, {texto} ")
     p.paragraph_format.space_after = Pt(space_after_pt)
 
 def _assinaturas_table(doc: DocxDocument):
@@ -599,32 +681,25 @@ def _assinaturas_table(doc: DocxDocument):
     cells = t.rows[0].cells
     for idx, nome in enumerate([PARTICIPANTES[0], PARTICIPANTES[1]]):
         p1 = cells[idx].paragraphs[0]; p1.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        r = p1.add_run(nome); r.bold = True; r.font.name = "Calibri"; r.font.size = Pt(11)
-        p2 = cells[idx].add_paragraph(); r2 = p2.add_run(CARGO); r2.font.name = "Calibri"; r2.font.size = Pt(11)
+        r = p1.add_run(nome); r.bold = True
+        p2 = cells[idx].add_paragraph(); p2.add_run(CARGO)
     # linha 2
     cells = t.rows[1].cells
     for idx, nome in enumerate([PARTICIPANTES[2], PARTICIPANTES[3]]):
         p1 = cells[idx].paragraphs[0]; p1.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        r = p1.add_run(nome); r.bold = True; r.font.name = "Calibri"; r.font.size = Pt(11)
-        p2 = cells[idx].add_paragraph(); r2 = p2.add_run(CARGO); r2.font.name = "Calibri"; r2.font.size = Pt(11)
+        r = p1.add_run(nome); r.bold = True
+        p2 = cells[idx].add_paragraph(); p2.add_run(CARGO)
     # linha 3 mesclada
     c = t.rows[2].cells; c[0].merge(c[1])
     p1 = c[0].paragraphs[0]; p1.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    r = p1.add_run(PARTICIPANTES[4]); r.bold = True; r.font.name = "Calibri"; r.font.size = Pt(11)
-    p2 = c[0].add_paragraph(); rr = p2.add_run(CARGO); rr.font.name = "Calibri"; rr.font.size = Pt(11)
-
-@app.get("/export/docx")
-async def export_docx():
-    conn = db_connect(); cur = conn.cursor()
-    cur.execute("SELECT * FROM meeting LIMIT 1"); meeting = dict(cur.fetchone())
-    cur.execute("SELECT participant, text, topic FROM scenario")
-    scenarios = {r[0]: {"text": r[1], "topic": r[2]} for r in cur.fetchall()}
-    conn.close()
+    r = p1.add_run(PARTICIPANTES[4]); r.bold = True
+    p2 = c[0].add_paragraph(); p2.add_run(CARGO)
 
+# Monta o DOCX inteiro (síncrono; roda fora do event loop via asyncio.to_thread)
+def build_docx(meeting: dict, scenarios: dict, state: AppState):
     d = date.fromisoformat(meeting["data"]); numero_fmt = numero_sessao_fmt(meeting["numero"], meeting["ano"])
 
-    doc = DocxDocument()
-    style = doc.styles["Normal"]; style.font.name = "Calibri"; style.font.size = Pt(11)
+    doc = DocxDocument(io.BytesIO(DOCX_BASE))
 
     # Cabeçalho (imagem) + espaço antes do primeiro título
     _add_header_image(doc, os.path.join(STATIC_DIR, "cabecalho.png"))
@@ -649,8 +724,8 @@ async def export_docx():
     last_p = None
     for nome in PARTICIPANTES:
         p = doc.add_paragraph(); p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        run_nome = p.add_run(nome); run_nome.font.name = "Calibri"; run_nome.font.size = Pt(11)
-        run_cargo = p.add_run(f" - {CARGO};"); run_cargo.font.name = "Calibri"; run_cargo.font.size = Pt(11)
+        p.add_run(nome)
+        p.add_run(f" - {CARGO};")
         last_p = p
     if last_p: last_p.paragraph_format.space_after = Pt(SECTION_GAP)
 
@@ -676,7 +751,7 @@ async def export_docx():
 
     # Item 02
     _add_title(doc, "Item 02 – Movimentações e Aplicações financeiras", space_after_pt=TITLE_GAP)
-    _add_paragraph(doc, STATE["item2"], False, WD_ALIGN_PARAGRAPH.JUSTIFY, space_after_pt=SECTION_GAP)
+    _add_paragraph(doc, state.item2, False, WD_ALIGN_PARAGRAPH.JUSTIFY, space_after_pt=SECTION_GAP)
 
     p = doc.add_paragraph()
     p.paragraph_format.space_after = Pt(10)  # controla a altura do espaço
@@ -684,16 +759,13 @@ async def export_docx():
     # Item 03
     _add_title(doc, "Item 03 – Acompanhamento dos Recursos Investidos:", space_after_pt=TITLE_GAP)
     d2 = menos_dois_meses(d); mes_ano = mes_ano_pt(d2)
-    p0 = ("O Comitê de Investimentos, buscando transmitir maior transparência em relação às análises dos investimentos do Instituto e, em consequência, "
-          "aderindo às normas do Pró-Gestão, elabora o “Relatório de Análise de Investimentos IPAJM”. Este relatório já foi encaminhado à SCO – Subgerência de Contabilidade e Orçamento, "
-          "para posterior envio para análise do Conselho Fiscal do IPAJM. "
-          f"Segue abaixo um resumo relativo aos itens abordados no Relatório supracitado de {mes_ano}:")
+    p0 = f"{ITEM3_INTRO} Segue abaixo um resumo relativo aos itens abordados no Relatório supracitado de {mes_ano}:"
     _add_paragraph(doc, p0, False, WD_ALIGN_PARAGRAPH.JUSTIFY, space_after_pt=0)
-    r = STATE["resumo"]; rentab=r["rentab"]; difpp=r["difpp"]; pos=r["posicao"]; risco=r["risco"]
+    rentab=state.rentab; difpp=state.difpp; pos=state.posicao; risco=state.risco
     _add_paragraph(doc, f"1) Acompanhamento da rentabilidade -  A rentabilidade consolidada dos investimentos do Fundo Previdenciário em {mes_ano} foi de {rentab}, ficando {difpp} p.p. {pos} da meta atuarial.", False, space_after_pt=0)
     _add_paragraph(doc, f"2) Avaliação de risco da carteira - O grau de variação nas rentabilidades está coerente com o grau de risco assumido, em {risco}.", False, space_after_pt=0)
     _add_paragraph(doc, f"3) Execução da Política de Investimentos – As movimentações financeiras realizadas no mês de {mes_ano} estão de acordo com as deliberações estabelecidas com a Diretoria de Investimentos e com a legislação vigente.", False, space_after_pt=0)
-    _add_paragraph(doc, f"4) Aderência a Política de Investimentos - Os recursos investidos, abrangendo a carteira consolidada, que representa o patrimônio total do RPPS sob gestão, estão aderentes à Política de Investimentos de {meeting['ano']}, respeitando o estabelecido na legislação em vigor e dentro dos percentuais definidos.  Considerando que as taxas ainda são negociadas acima da meta atuarial, seguimos com a estratégia de alcançar o alvo definido de 60% de alocação em Títulos Públicos.", False, space_after_pt=SECTION_GAP)
+    _add_paragraph(doc, f"4) Aderência a Política de Investimentos - Os recursos investidos, abrangendo a carteira consolidada, que representa o patrimônio total do RPPS sob gestão, estão aderentes à Política de Investimentos de {meeting['ano']}, {ITEM3_P4_FIM}", False, space_after_pt=SECTION_GAP)
 
 
     p = doc.add_paragraph()
@@ -701,13 +773,13 @@ async def export_docx():
 
     # Item 04
     _add_title(doc, "Item 04 – Assuntos Gerais", space_after_pt=TITLE_GAP)
-    _add_paragraph(doc, STATE["assuntos"], False, WD_ALIGN_PARAGRAPH.JUSTIFY, space_after_pt=SECTION_GAP)
+    _add_paragraph(doc, state.assuntos, False, WD_ALIGN_PARAGRAPH.JUSTIFY, space_after_pt=SECTION_GAP)
 
     p = doc.add_paragraph()
     p.paragraph_format.space_after = Pt(10)  # controla a altura do espaço
 
   # Fecho
-    lav = (meeting.get("lavrador") or "").strip() or "___________________________________"
+    lav = (meeting["lavrador"] or "").strip() or "___________________________________"
     _add_paragraph(
       doc,
       f"Nada mais havendo a tratar, foi encerrada a reunião e eu, {lav}, lavrei a presente Ata, assinada pelos membros presentes do Comitê de Investimentos.",
@@ -723,8 +795,16 @@ async def export_docx():
     _assinaturas_table(doc)
 
 
-    # Saída
-    buf = io.BytesIO(); doc.save(buf); buf.seek(0)
+    # Saída: em memória até DOCX_SPOOL_MAX; o download lê em blocos de DOWNLOAD_CHUNK
+    spool = tempfile.SpooledTemporaryFile(max_size=DOCX_SPOOL_MAX); doc.save(spool); spool.seek(0)
+    return spool
+
+@app.get("/export/docx")
+async def export_docx():
+    meeting, scenarios = load_ata()
+    # cópias tiradas no event loop: /scenario/save, /preview/update ou /resumo/update durante a exportação não misturam valores
+    spool = await asyncio.to_thread(build_docx, meeting, dict(scenarios), replace(STATE))
+    size = spool.seek(0, os.SEEK_END); spool.seek(0)  # tamanho conhecido: o navegador mostra o progresso
     filename = f"Ata_{meeting['numero']:03d}-{meeting['ano']}.docx"
-    return StreamingResponse(buf, media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                             headers={"Content-Disposition": f"attachment; filename={filename}"})
+    return StreamingResponse(_iter_spool(spool), media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                             headers={"Content-Disposition": f"attachment; filename={filename}", "Content-Length": str(size)})